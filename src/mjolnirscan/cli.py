@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+from functools import lru_cache
 import html
 import os
-import re
 import sys
 import time
 
@@ -48,28 +48,51 @@ _BINARY_UNITS = {
     "pib": 1024**5,
 }
 
+_SIZE_UNITS = ("KiB", "MiB", "GiB", "TiB", "PiB")
+
+
+def _split_number_unit(value: str) -> tuple[float, str]:
+    # Digits are ASCII only; non-ASCII decimal digits such as "٣" are rejected.
+    text = value.strip().lower()
+    end = len(text)
+    i = 0
+    while i < end and "0" <= text[i] <= "9":
+        i += 1
+    if i == 0:
+        raise ValueError(value)
+    if i < end and text[i] == ".":
+        j = i + 1
+        while j < end and "0" <= text[j] <= "9":
+            j += 1
+        if j == i + 1:
+            raise ValueError(value)
+        i = j
+    unit = text[i:].lstrip()
+    if unit and not (unit.isascii() and unit.isalpha()):
+        raise ValueError(value)
+    return float(text[:i]), unit
+
 
 def parse_duration(value: str) -> int:
-    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdwy]?)\s*", value.lower())
-    if not match:
+    try:
+        amount, unit = _split_number_unit(value)
+        multiplier = _DURATION_UNITS[unit or "d"]
+    except (ValueError, KeyError):
         raise argparse.ArgumentTypeError(
             "Invalid duration. Examples: 30d, 12h, 4w, 1y"
-        )
-    amount = float(match.group(1))
-    unit = match.group(2) or "d"
+        ) from None
     if amount < 0:
         raise argparse.ArgumentTypeError("Duration must be non-negative")
-    return int(amount * _DURATION_UNITS[unit])
+    return int(amount * multiplier)
 
 
 def parse_size(value: str) -> int:
-    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*", value.lower())
-    if not match:
+    try:
+        amount, unit = _split_number_unit(value)
+    except ValueError:
         raise argparse.ArgumentTypeError(
             "Invalid size. Examples: 500g, 1.5tb, 200gb, 750m"
-        )
-    amount = float(match.group(1))
-    unit = match.group(2)
+        ) from None
     if amount < 0:
         raise argparse.ArgumentTypeError("Size must be non-negative")
     if unit in ("", "b", "bytes"):
@@ -85,14 +108,12 @@ def parse_size(value: str) -> int:
     return int(amount * multiplier)
 
 
+@lru_cache(maxsize=4096)
 def format_size(num_bytes: int) -> str:
-    units = ["B", "KiB", "MiB", "GiB", "TiB", "PiB"]
-    size = float(num_bytes)
-    for unit in units:
-        if size < 1024 or unit == units[-1]:
-            return f"{size:.1f}{unit}" if unit != "B" else f"{int(size)}B"
-        size /= 1024
-    return f"{int(num_bytes)}B"
+    if num_bytes < 1024:
+        return f"{int(num_bytes)}B"
+    index = min(len(_SIZE_UNITS), (int(num_bytes).bit_length() - 1) // 10)
+    return f"{num_bytes / (1 << (10 * index)):.1f}{_SIZE_UNITS[index - 1]}"
 
 
 def format_elapsed(seconds: float) -> str:
@@ -104,8 +125,18 @@ def format_elapsed(seconds: float) -> str:
     return f"{minutes}:{secs:02d}"
 
 
+# Local dates change on whole-minute boundaries (UTC offsets and DST switches
+# since 1972 are whole minutes), so timestamps in the same minute share a date.
+_DATE_BUCKET = 60
+
+
+@lru_cache(maxsize=4096)
+def _format_date(bucket: int) -> str:
+    return dt.datetime.fromtimestamp(bucket * _DATE_BUCKET).strftime("%Y-%m-%d")
+
+
 def format_timestamp(ts: float) -> str:
-    return dt.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+    return _format_date(int(ts // _DATE_BUCKET))
 
 
 def render_text(
@@ -129,9 +160,9 @@ def render_text(
         print("No directories matched the criteria.")
     else:
         print(f"Flagged {len(results)} top-level directories:")
-        now = time.time()
+        now_days = time.time() / 86400
         for item in results:
-            age_days = (now - item.last_touched) / 86400
+            age_days = now_days - item.last_touched / 86400
             print(
                 f"- {item.path} | {format_size(item.size_bytes)} | "
                 f"last touched {format_timestamp(item.last_touched)} "
@@ -149,6 +180,8 @@ def render_text(
         print(f"Skipped symlinks: {report.stats.skipped_symlinks}")
     if verbose or report.stats.skipped_other_fs:
         print(f"Skipped other filesystems: {report.stats.skipped_other_fs}")
+    if report.stats.pruned_dirs:
+        print(f"Pruned recently touched directories: {report.stats.pruned_dirs}")
 
 
 def write_html_report(
@@ -160,28 +193,11 @@ def write_html_report(
     elapsed: float,
 ) -> None:
     cutoff_date = format_timestamp(cutoff)
-    generated = format_timestamp(time.time())
-
-    rows = []
-    for item in results:
-        age_days = (time.time() - item.last_touched) / 86400
-        rows.append(
-            """
-            <tr>
-              <td>{path}</td>
-              <td>{size}</td>
-              <td>{last}</td>
-              <td>{age:.0f}</td>
-            </tr>
-            """.format(
-                path=html.escape(item.path),
-                size=html.escape(format_size(item.size_bytes)),
-                last=html.escape(format_timestamp(item.last_touched)),
-                age=age_days,
-            )
-        )
+    now = time.time()
+    now_days = now / 86400
+    generated = format_timestamp(now)
 
-    html_doc = """<!doctype html>
+    head = """<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8" />
@@ -210,13 +226,7 @@ def write_html_report(
         <th>Age (days)</th>
       </tr>
     </thead>
-    <tbody>
-      {rows}
-    </tbody>
-  </table>
-</body>
-</html>
-""".format(
+    <tbody>""".format(
         generated=html.escape(generated),
         cutoff=html.escape(cutoff_date),
         min_size=html.escape(format_size(min_size)),
@@ -224,11 +234,29 @@ def write_html_report(
         files=report.stats.files_scanned,
         elapsed=html.escape(format_elapsed(elapsed)),
         count=len(results),
-        rows="\n".join(rows) or "<tr><td colspan=\"4\">No matches</td></tr>",
     )
+    tail = """
+    </tbody>
+  </table>
+</body>
+</html>
+"""
 
-    with open(output_path, "w", encoding="utf-8") as handle:
-        handle.write(html_doc)
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 16) as handle:
+        handle.write(head)
+        for item in results:
+            handle.write(
+                f"""
+      <tr>
+        <td>{html.escape(item.path)}</td>
+        <td>{html.escape(format_size(item.size_bytes))}</td>
+        <td>{html.escape(format_timestamp(item.last_touched))}</td>
+        <td>{now_days - item.last_touched / 86400:.0f}</td>
+      </tr>"""
+            )
+        if not results:
+            handle.write("\n      <tr><td colspan=\"4\">No matches</td></tr>")
+        handle.write(tail)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -271,11 +299,32 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Follow symlinks (cycle detection enabled)",
     )
+    parser.add_argument(
+        "--aggressive-prune",
+        action="store_true",
+        help=(
+            "Do not descend into directories whose own timestamp is newer than "
+            "the cutoff (faster, but may miss old data inside them)"
+        ),
+    )
+    parser.add_argument(
+        "--dir-times-only",
+        action="store_true",
+        help=(
+            "Judge recency from directory timestamps only and skip per-file "
+            "stat calls (requires --min-size 0)"
+        ),
+    )
     parser.add_argument(
         "--workers",
         type=int,
         default=1,
-        help="Number of worker processes for parallel scan (default: 1)",
+        help="Number of worker threads for parallel scan (default: 1)",
+    )
+    parser.add_argument(
+        "--multiprocess",
+        action="store_true",
+        help="Use worker processes split across top-level directories instead of threads",
     )
     parser.add_argument(
         "-v",
@@ -325,9 +374,12 @@ def main(argv: list[str] | None = None) -> int:
     if args.workers < 1:
         print("Error: --workers must be >= 1", file=sys.stderr)
         return 2
+    if args.dir_times_only and args.min_size:
+        print("Error: --dir-times-only requires --min-size 0", file=sys.stderr)
+        return 2
 
     workers = args.workers
-    if workers > 1 and args.follow_symlinks:
+    if workers > 1 and args.multiprocess and args.follow_symlinks:
         print(
             "Warning: --follow-symlinks disables parallel mode to avoid double counting.",
             file=sys.stderr,
@@ -335,7 +387,12 @@ def main(argv: list[str] | None = None) -> int:
         workers = 1
 
     if args.verbose:
-        mode = "parallel" if workers > 1 else "single"
+        if workers == 1:
+            mode = "single"
+        elif args.multiprocess:
+            mode = "parallel, processes"
+        else:
+            mode = "parallel, threads"
         print(f"Scan root: {root}")
         print(f"Mode: {mode} ({workers} worker{'s' if workers != 1 else ''})")
 
@@ -348,6 +405,9 @@ def main(argv: list[str] | None = None) -> int:
             workers=workers,
             follow_symlinks=args.follow_symlinks,
             one_filesystem=args.one_filesystem,
+            aggressive_prune=args.aggressive_prune,
+            stat_files=not args.dir_times_only,
+            multiprocess=args.multiprocess,
         )
     else:
         report = scan_directories(
@@ -357,6 +417,8 @@ def main(argv: list[str] | None = None) -> int:
             time_attr=time_attr,
             follow_symlinks=args.follow_symlinks,
             one_filesystem=args.one_filesystem,
+            aggressive_prune=args.aggressive_prune,
+            stat_files=not args.dir_times_only,
         )
     elapsed = time.monotonic() - start
 
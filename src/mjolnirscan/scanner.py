@@ -1,37 +1,42 @@
 from __future__ import annotations
 
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from functools import partial
 import errno
 import os
-from pathlib import Path
+import resource
+from stat import S_IFDIR, S_IFLNK
+import threading
 import time
-from typing import Iterable
+from typing import Callable, Generator, Iterable, NamedTuple
 
 
-@dataclass(frozen=True)
-class DirResult:
+class DirResult(NamedTuple):
     path: str
     size_bytes: int
     last_touched: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScanError:
     path: str
     message: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScanStats:
     dirs_scanned: int
     files_scanned: int
     skipped_symlinks: int
     skipped_other_fs: int
     errors: int
+    pruned_dirs: int = 0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScanReport:
     candidates: list[DirResult]
     errors: list[ScanError]
@@ -39,7 +44,208 @@ class ScanReport:
     root_summary: DirResult | None
 
 
-def scan_directories(
+_S_IFMT = 0o170000
+
+# Positions of the whole-second timestamps in the os.stat_result sequence.
+# Indexing is cheaper than attribute lookup in the per-entry loop, and
+# second resolution is plenty for cutoffs measured in days.
+_TIME_INDEXES = {"st_atime": 7, "st_mtime": 8, "st_ctime": 9}
+
+# (size, newest, files, skipped symlinks, skipped other-fs, pruned, subdirs)
+_DirScanResult = tuple[
+    int, float, int, int, int, int, list[tuple[str, os.stat_result]]
+]
+
+_DIR_FD_SUPPORTED = os.open in os.supports_dir_fd and os.scandir in os.supports_fd
+
+# Ancestor descriptors the sequential walk keeps open for relative opens.
+# Deeper directories are scanned by path, so depth alone cannot exhaust
+# RLIMIT_NOFILE.
+_MAX_HELD_FDS = 64
+_FD_EXHAUSTED_ERRNOS = frozenset({errno.EMFILE, errno.ENFILE})
+
+# Failures worth remembering across scans: they persist until someone fixes
+# the tree, unlike transient errors such as EMFILE or EIO.
+_NEGATIVE_ERRNOS = frozenset({errno.ENOENT, errno.EACCES})
+
+
+def _max_held_fds() -> int:
+    # scandir(fd) dups the descriptor, and the rest of the process needs
+    # some too, so only hold a quarter of the soft limit at most.
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return _MAX_HELD_FDS
+    return max(1, min(_MAX_HELD_FDS, soft // 4))
+
+
+def _check_stat_files(min_size: int, stat_files: bool) -> None:
+    # Without per-file stats every size is zero, so a size threshold could
+    # never match.
+    if not stat_files and min_size > 0:
+        raise ValueError("stat_files=False requires min_size 0")
+
+
+def _scan_dir(
+    path: str,
+    dir_fd: int | None,
+    newest: float,
+    now: float,
+    time_index: int,
+    record_error: Callable[[str, BaseException], None],
+    follow_symlinks: bool,
+    one_filesystem: bool,
+    root_dev: int | None,
+    prune_after: float | None,
+    stat_files: bool,
+) -> _DirScanResult:
+    size = 0
+    files_scanned = 0
+    skipped_symlinks = 0
+    skipped_other_fs = 0
+    pruned_dirs = 0
+    subdirs: list[tuple[str, os.stat_result]] = []
+    prefix = os.path.join(path, "")
+    had_error = False
+    add_subdir = subdirs.append
+    ifmt = _S_IFMT
+    iflnk = S_IFLNK
+    ifdir = S_IFDIR
+
+    try:
+        with os.scandir(path if dir_fd is None else dir_fd) as it:
+            for entry in it:
+                try:
+                    if not stat_files and not entry.is_dir(
+                        follow_symlinks=follow_symlinks
+                    ):
+                        # d_type is enough to tell files from directories, so
+                        # files are counted without a stat call.
+                        if not follow_symlinks and entry.is_symlink():
+                            skipped_symlinks += 1
+                        else:
+                            files_scanned += 1
+                        continue
+                    entry_stat = entry.stat(follow_symlinks=False)
+                    kind = entry_stat.st_mode & ifmt
+                    if kind == iflnk:
+                        if not follow_symlinks:
+                            skipped_symlinks += 1
+                            continue
+                        entry_stat = entry.stat()
+                        kind = entry_stat.st_mode & ifmt
+                    if kind == ifdir:
+                        if one_filesystem and entry_stat.st_dev != root_dev:
+                            skipped_other_fs += 1
+                            continue
+                        if prune_after is not None:
+                            dir_time = entry_stat[time_index]
+                            if dir_time > prune_after:
+                                pruned_dirs += 1
+                                if dir_time > newest:
+                                    newest = dir_time
+                                continue
+                        add_subdir((prefix + entry.name, entry_stat))
+                    else:
+                        files_scanned += 1
+                        size += entry_stat.st_size
+                        entry_time = entry_stat[time_index]
+                        if entry_time > newest:
+                            newest = entry_time
+                except OSError as exc:
+                    record_error(prefix + entry.name, exc)
+                    had_error = True
+    except OSError as exc:
+        record_error(path, exc)
+        had_error = True
+
+    # Anything we could not read might be recent, so never flag a directory
+    # with errors as old.
+    if had_error and newest < now:
+        newest = now
+
+    return (
+        size,
+        newest,
+        files_scanned,
+        skipped_symlinks,
+        skipped_other_fs,
+        pruned_dirs,
+        subdirs,
+    )
+
+
+def _scan_dir_plain(
+    path: str,
+    dir_fd: int | None,
+    newest: float,
+    now: float,
+    time_index: int,
+    record_error: Callable[[str, BaseException], None],
+) -> _DirScanResult:
+    # Same contract as _scan_dir for the default options (no symlink
+    # following, no device check, no pruning, every entry stat'ed), without
+    # testing those options once per entry.
+    size = 0
+    files_scanned = 0
+    skipped_symlinks = 0
+    subdirs: list[tuple[str, os.stat_result]] = []
+    prefix = os.path.join(path, "")
+    had_error = False
+    add_subdir = subdirs.append
+    ifmt = _S_IFMT
+    iflnk = S_IFLNK
+    ifdir = S_IFDIR
+
+    try:
+        with os.scandir(path if dir_fd is None else dir_fd) as it:
+            for entry in it:
+                try:
+                    entry_stat = entry.stat(follow_symlinks=False)
+                    kind = entry_stat.st_mode & ifmt
+                    if kind == ifdir:
+                        add_subdir((prefix + entry.name, entry_stat))
+                    elif kind == iflnk:
+                        skipped_symlinks += 1
+                    else:
+                        files_scanned += 1
+                        size += entry_stat.st_size
+                        entry_time = entry_stat[time_index]
+                        if entry_time > newest:
+                            newest = entry_time
+                except OSError as exc:
+                    record_error(prefix + entry.name, exc)
+                    had_error = True
+    except OSError as exc:
+        record_error(path, exc)
+        had_error = True
+
+    if had_error and newest < now:
+        newest = now
+
+    return size, newest, files_scanned, skipped_symlinks, 0, 0, subdirs
+
+
+def _select_scan_dir(
+    follow_symlinks: bool,
+    one_filesystem: bool,
+    root_dev: int | None,
+    prune_after: float | None,
+    stat_files: bool,
+) -> Callable[..., _DirScanResult]:
+    # Both choices take (path, dir_fd, newest, now, time_index, record_error).
+    if follow_symlinks or one_filesystem or prune_after is not None or not stat_files:
+        return partial(
+            _scan_dir,
+            follow_symlinks=follow_symlinks,
+            one_filesystem=one_filesystem,
+            root_dev=root_dev,
+            prune_after=prune_after,
+            stat_files=stat_files,
+        )
+    return _scan_dir_plain
+
+
+def scan_directories_iter(
     root: str,
     min_size: int,
     cutoff: float,
@@ -48,8 +254,44 @@ def scan_directories(
     follow_symlinks: bool = False,
     one_filesystem: bool = False,
     error_limit: int = 200,
-) -> ScanReport:
-    root = os.path.abspath(root)
+    aggressive_prune: bool = False,
+    stat_files: bool = True,
+    negative_cache: dict[str, float] | None = None,
+    negative_ttl: float = 300.0,
+) -> Generator[DirResult | ScanError, None, tuple[ScanStats, DirResult | None]]:
+    # Yields candidates as their subtrees finish and errors as they are
+    # recorded, then returns (stats, root_summary). Arguments are checked
+    # here, before the generator is created, so bad ones fail at the call.
+    time_index = _TIME_INDEXES[time_attr]
+    _check_stat_files(min_size, stat_files)
+    return _scan_directories_iter(
+        os.path.abspath(root),
+        min_size,
+        cutoff,
+        time_index,
+        follow_symlinks,
+        one_filesystem,
+        error_limit,
+        cutoff if aggressive_prune else None,
+        stat_files,
+        negative_cache,
+        negative_ttl,
+    )
+
+
+def _scan_directories_iter(
+    root: str,
+    min_size: int,
+    cutoff: float,
+    time_index: int,
+    follow_symlinks: bool,
+    one_filesystem: bool,
+    error_limit: int,
+    prune_after: float | None,
+    stat_files: bool,
+    negative_cache: dict[str, float] | None,
+    negative_ttl: float,
+) -> Generator[DirResult | ScanError, None, tuple[ScanStats, DirResult | None]]:
     now = time.time()
 
     errors: list[ScanError] = []
@@ -59,135 +301,243 @@ def scan_directories(
     def record_error(path: str, exc: BaseException) -> None:
         nonlocal error_count
         error_count += 1
-        if len(errors) < error_limit:
+        if error_count <= error_limit:
             errors.append(ScanError(path=path, message=str(exc)))
 
-    root_dev = None
-    if one_filesystem:
-        try:
-            root_dev = os.stat(root, follow_symlinks=follow_symlinks).st_dev
-        except OSError as exc:
-            record_error(root, exc)
-            return ScanReport(
-                candidates=[],
-                errors=errors,
-                stats=ScanStats(
+    root_stat = None
+    try:
+        root_stat = os.stat(root, follow_symlinks=follow_symlinks)
+    except OSError as exc:
+        record_error(root, exc)
+        if one_filesystem:
+            yield from errors
+            return (
+                ScanStats(
                     dirs_scanned=0,
                     files_scanned=0,
                     skipped_symlinks=0,
                     skipped_other_fs=0,
                     errors=error_count,
                 ),
+                None,
             )
 
-    stack: list[tuple[str, str | None, bool]] = [(root, None, False)]
-    aggregate: dict[str, list[float | int]] = {}
-    candidates: list[DirResult] = []
+    visited_dirs: set[tuple[int, int]] = set()
+    root_dev = None
+    root_time = now
+    if root_stat is not None:
+        root_dev = root_stat.st_dev
+        root_time = root_stat[time_index]
+        visited_dirs.add((root_stat.st_dev, root_stat.st_ino))
+
+    # Frames are [path, parent_frame, size, newest, fd]. A frame stays on the
+    # stack while its children are processed and is finalized once it is back
+    # on top, rolling its totals into the parent frame in place. The fd slot
+    # is None until the directory is expanded; afterwards it holds the open
+    # directory descriptor so children can be opened relative to it, or -1
+    # when the directory was read by path and its children are too.
+    # Subdirectories are stat'ed once when discovered, so a frame starts out
+    # with the directory's own timestamp as its newest value.
+    stack: list[list] = [[root, None, 0, root_time, None]]
 
     dirs_scanned = 0
     files_scanned = 0
     skipped_symlinks = 0
     skipped_other_fs = 0
+    pruned_dirs = 0
 
-    visited_dirs: set[tuple[int, int]] = set()
+    if negative_cache:
+        # Drop expired failures up front, including paths that no longer
+        # exist and so will never be looked up again.
+        expired_before = time.monotonic() - negative_ttl
+        for failed_path in [
+            failed_path
+            for failed_path, failed_at in negative_cache.items()
+            if failed_at <= expired_before
+        ]:
+            del negative_cache[failed_path]
 
-    scandir = os.scandir
-    stat = os.stat
+    push = stack.append
+    pop = stack.pop
+    open_dir = os.open
+    close_dir = os.close
+    scan_dir = _select_scan_dir(
+        follow_symlinks, one_filesystem, root_dev, prune_after, stat_files
+    )
+    use_dir_fd = _DIR_FD_SUPPORTED
+    monotonic = time.monotonic
+    held_fds = 0
+    max_held_fds = _max_held_fds()
 
-    while stack:
-        path, parent, visited = stack.pop()
-        if not visited:
-            dir_stat = None
-            newest = now
-            try:
-                dir_stat = stat(path, follow_symlinks=follow_symlinks)
-                newest = getattr(dir_stat, time_attr)
-            except OSError as exc:
-                record_error(path, exc)
-                newest = now
-
-            if follow_symlinks and dir_stat is not None:
-                key = (dir_stat.st_dev, dir_stat.st_ino)
-                if key in visited_dirs:
-                    skipped_symlinks += 1
-                    continue
-                visited_dirs.add(key)
+    sep = os.sep
+    # The root itself is always followed, as scandir(root) would; only
+    # children discovered during the walk must not be symlinks.
+    root_flags = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)
+    open_flags = root_flags
+    if not follow_symlinks:
+        open_flags |= getattr(os, "O_NOFOLLOW", 0)
 
-            stack.append((path, parent, True))
-            size = 0
+    try:
+        while stack:
+            if errors:
+                yield from errors
+                errors.clear()
+            frame = stack[-1]
+            if frame[4] is not None:
+                pop()
+                path, parent, size, newest, fd = frame
+                if fd >= 0:
+                    close_dir(fd)
+                    held_fds -= 1
+                if size >= min_size and newest <= cutoff:
+                    yield DirResult(path=path, size_bytes=int(size), last_touched=float(newest))
+                if parent is None:
+                    root_summary = DirResult(
+                        path=path, size_bytes=int(size), last_touched=float(newest)
+                    )
+                else:
+                    parent[2] += size
+                    if newest > parent[3]:
+                        parent[3] = newest
+                continue
 
-            aggregate[path] = [size, newest]
+            path, parent = frame[0], frame[1]
+            frame[4] = -1
+            if negative_cache is not None:
+                failed_at = negative_cache.get(path)
+                if failed_at is not None:
+                    if monotonic() - failed_at < negative_ttl:
+                        record_error(path, OSError("skipped: failed on a recent scan"))
+                        frame[3] = max(frame[3], now)
+                        continue
+                    del negative_cache[path]
             dirs_scanned += 1
+            if use_dir_fd and held_fds < max_held_fds:
+                try:
+                    if parent is None:
+                        fd = open_dir(path, root_flags)
+                    elif parent[4] >= 0:
+                        fd = open_dir(
+                            path.rpartition(sep)[2], open_flags, dir_fd=parent[4]
+                        )
+                    else:
+                        fd = open_dir(path, open_flags)
+                except OSError as exc:
+                    if exc.errno not in _FD_EXHAUSTED_ERRNOS:
+                        record_error(path, exc)
+                        if negative_cache is not None and exc.errno in _NEGATIVE_ERRNOS:
+                            negative_cache[path] = monotonic()
+                        frame[3] = max(frame[3], now)
+                        continue
+                    # Out of descriptors: give back the parent's (its other
+                    # children reopen by path), hold no more than we have now,
+                    # and scan this directory by path.
+                    if parent is not None and parent[4] >= 0:
+                        close_dir(parent[4])
+                        parent[4] = -1
+                        held_fds -= 1
+                    max_held_fds = held_fds
+                else:
+                    frame[4] = fd
+                    held_fds += 1
+                    if negative_cache is not None:
+                        negative_cache.pop(path, None)
+            if frame[4] < 0 and negative_cache is not None:
+                # Read by path: probe the open here so its failures are
+                # cached as well. Anything else is left to scan_dir.
+                try:
+                    close_dir(open_dir(path, root_flags if parent is None else open_flags))
+                except OSError as exc:
+                    if exc.errno in _NEGATIVE_ERRNOS:
+                        record_error(path, exc)
+                        negative_cache[path] = monotonic()
+                        frame[3] = max(frame[3], now)
+                        continue
+                else:
+                    negative_cache.pop(path, None)
 
-            try:
-                with scandir(path) as it:
-                    for entry in it:
-                        try:
-                            if entry.is_dir(follow_symlinks=follow_symlinks):
-                                if entry.is_symlink() and not follow_symlinks:
-                                    skipped_symlinks += 1
-                                    continue
-                                if one_filesystem:
-                                    try:
-                                        entry_stat = entry.stat(
-                                            follow_symlinks=follow_symlinks
-                                        )
-                                    except OSError as exc:
-                                        record_error(entry.path, exc)
-                                        newest = max(newest, now)
-                                        continue
-                                    if entry_stat.st_dev != root_dev:
-                                        skipped_other_fs += 1
-                                        continue
-                                stack.append((entry.path, path, False))
-                            else:
-                                if entry.is_symlink() and not follow_symlinks:
-                                    skipped_symlinks += 1
-                                    continue
-                                try:
-                                    entry_stat = entry.stat(
-                                        follow_symlinks=follow_symlinks
-                                    )
-                                except OSError as exc:
-                                    record_error(entry.path, exc)
-                                    newest = max(newest, now)
-                                    continue
-                                files_scanned += 1
-                                size += entry_stat.st_size
-                                entry_time = getattr(entry_stat, time_attr)
-                                if entry_time > newest:
-                                    newest = entry_time
-                        except OSError as exc:
-                            record_error(entry.path, exc)
-                            newest = max(newest, now)
-            except OSError as exc:
-                record_error(path, exc)
-                newest = max(newest, now)
-
-            aggregate[path] = [size, newest]
-        else:
-            size, newest = aggregate.pop(path, [0, now])
-            if size >= min_size and newest <= cutoff:
-                candidates.append(DirResult(path=path, size_bytes=int(size), last_touched=float(newest)))
-            if path == root:
-                root_summary = DirResult(
-                    path=path, size_bytes=int(size), last_touched=float(newest)
-                )
+            size, newest, files, symlinks, other_fs, pruned, subdirs = scan_dir(
+                path,
+                frame[4] if frame[4] >= 0 else None,
+                frame[3],
+                now,
+                time_index,
+                record_error,
+            )
+            frame[2] = size
+            frame[3] = newest
+            files_scanned += files
+            skipped_symlinks += symlinks
+            skipped_other_fs += other_fs
+            pruned_dirs += pruned
 
-            if parent is not None:
-                parent_size, parent_newest = aggregate.get(parent, [0, now])
-                parent_size += size
-                if newest > parent_newest:
-                    parent_newest = newest
-                aggregate[parent] = [parent_size, parent_newest]
+            for child_path, child_stat in subdirs:
+                # The stat from discovery doubles as the cycle check. Without
+                # symlink following, a repeat can still come from a bind
+                # mount looping back into the tree.
+                key = (child_stat.st_dev, child_stat.st_ino)
+                if key in visited_dirs:
+                    if follow_symlinks:
+                        skipped_symlinks += 1
+                    continue
+                visited_dirs.add(key)
+                push([child_path, frame, 0, child_stat[time_index], None])
+    finally:
+        for frame in stack:
+            if frame[4] is not None and frame[4] >= 0:
+                os.close(frame[4])
 
+    yield from errors
     stats = ScanStats(
         dirs_scanned=dirs_scanned,
         files_scanned=files_scanned,
         skipped_symlinks=skipped_symlinks,
         skipped_other_fs=skipped_other_fs,
         errors=error_count,
+        pruned_dirs=pruned_dirs,
+    )
+    return stats, root_summary
+
+
+def scan_directories(
+    root: str,
+    min_size: int,
+    cutoff: float,
+    time_attr: str,
+    *,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    error_limit: int = 200,
+    aggressive_prune: bool = False,
+    stat_files: bool = True,
+    negative_cache: dict[str, float] | None = None,
+    negative_ttl: float = 300.0,
+) -> ScanReport:
+    candidates: list[DirResult] = []
+    errors: list[ScanError] = []
+    results = scan_directories_iter(
+        root,
+        min_size,
+        cutoff,
+        time_attr,
+        follow_symlinks=follow_symlinks,
+        one_filesystem=one_filesystem,
+        error_limit=error_limit,
+        aggressive_prune=aggressive_prune,
+        stat_files=stat_files,
+        negative_cache=negative_cache,
+        negative_ttl=negative_ttl,
     )
+    while True:
+        try:
+            item = next(results)
+        except StopIteration as done:
+            stats, root_summary = done.value
+            break
+        if type(item) is DirResult:
+            candidates.append(item)
+        else:
+            errors.append(item)
     return ScanReport(
         candidates=candidates, errors=errors, stats=stats, root_summary=root_summary
     )
@@ -203,8 +553,10 @@ def scan_directories_parallel(
     follow_symlinks: bool = False,
     one_filesystem: bool = False,
     error_limit: int = 200,
+    aggressive_prune: bool = False,
+    stat_files: bool = True,
+    multiprocess: bool = False,
 ) -> ScanReport:
-    _patch_multiprocessing_tempdir_cleanup()
     if workers <= 1:
         return scan_directories(
             root=root,
@@ -214,10 +566,241 @@ def scan_directories_parallel(
             follow_symlinks=follow_symlinks,
             one_filesystem=one_filesystem,
             error_limit=error_limit,
+            aggressive_prune=aggressive_prune,
+            stat_files=stat_files,
         )
+    if multiprocess:
+        return _scan_directories_multiprocess(
+            root,
+            min_size,
+            cutoff,
+            time_attr,
+            workers,
+            follow_symlinks=follow_symlinks,
+            one_filesystem=one_filesystem,
+            error_limit=error_limit,
+            aggressive_prune=aggressive_prune,
+            stat_files=stat_files,
+        )
+    return _scan_directories_threaded(
+        root,
+        min_size,
+        cutoff,
+        time_attr,
+        workers,
+        follow_symlinks=follow_symlinks,
+        one_filesystem=one_filesystem,
+        error_limit=error_limit,
+        aggressive_prune=aggressive_prune,
+        stat_files=stat_files,
+    )
 
+
+def _scan_directories_threaded(
+    root: str,
+    min_size: int,
+    cutoff: float,
+    time_attr: str,
+    workers: int,
+    *,
+    follow_symlinks: bool,
+    one_filesystem: bool,
+    error_limit: int,
+    aggressive_prune: bool,
+    stat_files: bool,
+) -> ScanReport:
     root = os.path.abspath(root)
     now = time.time()
+    time_index = _TIME_INDEXES[time_attr]
+    prune_after = cutoff if aggressive_prune else None
+    _check_stat_files(min_size, stat_files)
+    lock = threading.Lock()
+
+    errors: list[ScanError] = []
+    error_count = 0
+
+    def record_error(path: str, exc: BaseException) -> None:
+        nonlocal error_count
+        with lock:
+            error_count += 1
+            keep = error_count <= error_limit
+        if keep:
+            # Format the message outside the lock; only the first
+            # error_limit errors are ever formatted.
+            error = ScanError(path=path, message=str(exc))
+            with lock:
+                errors.append(error)
+
+    root_stat = None
+    try:
+        root_stat = os.stat(root, follow_symlinks=follow_symlinks)
+    except OSError as exc:
+        record_error(root, exc)
+        if one_filesystem:
+            return ScanReport(
+                candidates=[],
+                errors=errors,
+                stats=ScanStats(
+                    dirs_scanned=0,
+                    files_scanned=0,
+                    skipped_symlinks=0,
+                    skipped_other_fs=0,
+                    errors=error_count,
+                ),
+                root_summary=None,
+            )
+
+    visited_dirs: set[tuple[int, int]] = set()
+    root_dev = None
+    root_time = now
+    if root_stat is not None:
+        root_dev = root_stat.st_dev
+        root_time = root_stat[time_index]
+        visited_dirs.add((root_stat.st_dev, root_stat.st_ino))
+
+    # Per-directory state is kept in parallel arrays indexed by directory id.
+    # Ids are handed out at discovery, so every directory has a larger id than
+    # its parent and a reverse sweep rolls totals up bottom-first. Pending
+    # items carry the path and initial timestamp so workers only touch the
+    # shared arrays under the lock. Pending work is taken LIFO, so workers
+    # tend to stay inside recently discovered subtrees.
+    paths: list[str] = [root]
+    parents = array("q", [-1])
+    sizes = array("Q", [0])
+    newests = array("d", [root_time])
+    pending: deque[tuple[int, str, float]] = deque([(0, root, root_time)])
+    ready = threading.Condition(lock)
+    outstanding = 1
+    stopping = False
+    scan_dir = _select_scan_dir(
+        follow_symlinks, one_filesystem, root_dev, prune_after, stat_files
+    )
+
+    def worker() -> tuple[int, int, int, int, int]:
+        nonlocal outstanding
+        dirs_scanned = 0
+        files_scanned = 0
+        skipped_symlinks = 0
+        skipped_other_fs = 0
+        pruned_dirs = 0
+
+        while True:
+            with ready:
+                while not pending and outstanding and not stopping:
+                    ready.wait()
+                if stopping or not pending:
+                    break
+                index, path, newest = pending.pop()
+            size = 0
+            subdirs: list[tuple[str, os.stat_result]] = []
+            try:
+                dirs_scanned += 1
+                size, newest, files, symlinks, other_fs, pruned, subdirs = scan_dir(
+                    path,
+                    None,
+                    newest,
+                    now,
+                    time_index,
+                    record_error,
+                )
+                files_scanned += files
+                skipped_symlinks += symlinks
+                skipped_other_fs += other_fs
+                pruned_dirs += pruned
+            finally:
+                with ready:
+                    sizes[index] = size
+                    newests[index] = newest
+                    added = 0
+                    for child_path, child_stat in subdirs:
+                        key = (child_stat.st_dev, child_stat.st_ino)
+                        if key in visited_dirs:
+                            if follow_symlinks:
+                                skipped_symlinks += 1
+                            continue
+                        visited_dirs.add(key)
+                        child_time = child_stat[time_index]
+                        pending.append((len(paths), child_path, child_time))
+                        paths.append(child_path)
+                        parents.append(index)
+                        sizes.append(0)
+                        newests.append(child_time)
+                        added += 1
+                    outstanding += added - 1
+                    if outstanding == 0:
+                        ready.notify_all()
+                    elif added:
+                        ready.notify(added)
+
+        return (
+            dirs_scanned,
+            files_scanned,
+            skipped_symlinks,
+            skipped_other_fs,
+            pruned_dirs,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker) for _ in range(workers)]
+        try:
+            totals = [future.result() for future in futures]
+        except BaseException:
+            # Let workers finish their current directory and exit, so
+            # Ctrl-C does not wait for the rest of the tree.
+            with ready:
+                stopping = True
+                ready.notify_all()
+            raise
+
+    candidates: list[DirResult] = []
+    for index in range(len(paths) - 1, -1, -1):
+        size = sizes[index]
+        newest = newests[index]
+        if size >= min_size and newest <= cutoff:
+            candidates.append(DirResult(path=paths[index], size_bytes=size, last_touched=newest))
+        parent = parents[index]
+        if parent >= 0:
+            sizes[parent] += size
+            if newest > newests[parent]:
+                newests[parent] = newest
+
+    root_summary = DirResult(
+        path=root, size_bytes=sizes[0], last_touched=newests[0]
+    )
+
+    stats = ScanStats(
+        dirs_scanned=sum(total[0] for total in totals),
+        files_scanned=sum(total[1] for total in totals),
+        skipped_symlinks=sum(total[2] for total in totals),
+        skipped_other_fs=sum(total[3] for total in totals),
+        errors=error_count,
+        pruned_dirs=sum(total[4] for total in totals),
+    )
+    return ScanReport(
+        candidates=candidates, errors=errors, stats=stats, root_summary=root_summary
+    )
+
+
+def _scan_directories_multiprocess(
+    root: str,
+    min_size: int,
+    cutoff: float,
+    time_attr: str,
+    workers: int,
+    *,
+    follow_symlinks: bool,
+    one_filesystem: bool,
+    error_limit: int,
+    aggressive_prune: bool,
+    stat_files: bool,
+) -> ScanReport:
+    _patch_multiprocessing_tempdir_cleanup()
+
+    root = os.path.abspath(root)
+    now = time.time()
+    time_index = _TIME_INDEXES[time_attr]
+    prune_after = cutoff if aggressive_prune else None
+    _check_stat_files(min_size, stat_files)
 
     errors: list[ScanError] = []
     error_count = 0
@@ -225,7 +808,7 @@ def scan_directories_parallel(
     def record_error(path: str, exc: BaseException) -> None:
         nonlocal error_count
         error_count += 1
-        if len(errors) < error_limit:
+        if error_count <= error_limit:
             errors.append(ScanError(path=path, message=str(exc)))
 
     root_stat = None
@@ -253,78 +836,48 @@ def scan_directories_parallel(
             record_error(root, exc)
 
     root_dev = root_stat.st_dev if (one_filesystem and root_stat is not None) else None
-    root_time = getattr(root_stat, time_attr) if root_stat is not None else now
-    root_size = 0
-    root_newest = root_time
+    root_time = root_stat[time_index] if root_stat is not None else now
 
+    scan_dir = _select_scan_dir(
+        follow_symlinks, one_filesystem, root_dev, prune_after, stat_files
+    )
     dirs_scanned = 1
-    files_scanned = 0
-    skipped_symlinks = 0
-    skipped_other_fs = 0
-
-    child_dirs: list[str] = []
-
-    try:
-        with os.scandir(root) as it:
-            for entry in it:
-                try:
-                    if entry.is_dir(follow_symlinks=follow_symlinks):
-                        if entry.is_symlink() and not follow_symlinks:
-                            skipped_symlinks += 1
-                            continue
-                        if one_filesystem:
-                            try:
-                                entry_stat = entry.stat(
-                                    follow_symlinks=follow_symlinks
-                                )
-                            except OSError as exc:
-                                record_error(entry.path, exc)
-                                root_newest = max(root_newest, now)
-                                continue
-                            if entry_stat.st_dev != root_dev:
-                                skipped_other_fs += 1
-                                continue
-                        child_dirs.append(entry.path)
-                    else:
-                        if entry.is_symlink() and not follow_symlinks:
-                            skipped_symlinks += 1
-                            continue
-                        try:
-                            entry_stat = entry.stat(
-                                follow_symlinks=follow_symlinks
-                            )
-                        except OSError as exc:
-                            record_error(entry.path, exc)
-                            root_newest = max(root_newest, now)
-                            continue
-                        files_scanned += 1
-                        root_size += entry_stat.st_size
-                        entry_time = getattr(entry_stat, time_attr)
-                        if entry_time > root_newest:
-                            root_newest = entry_time
-                except OSError as exc:
-                    record_error(entry.path, exc)
-                    root_newest = max(root_newest, now)
-    except OSError as exc:
-        record_error(root, exc)
-        root_newest = max(root_newest, now)
+    (
+        root_size,
+        root_newest,
+        files_scanned,
+        skipped_symlinks,
+        skipped_other_fs,
+        pruned_dirs,
+        subdirs,
+    ) = scan_dir(
+        root,
+        None,
+        root_time,
+        now,
+        time_index,
+        record_error,
+    )
+    child_dirs = [child_path for child_path, _ in subdirs]
 
     candidates: list[DirResult] = []
-    reports: list[ScanReport] = []
+    reports: list[tuple] = []
 
     if child_dirs:
         max_workers = min(workers, len(child_dirs))
         with ProcessPoolExecutor(max_workers=max_workers) as executor:
             futures = {
                 executor.submit(
-                    scan_directories,
+                    _scan_directories_raw,
                     child,
                     min_size,
                     cutoff,
                     time_attr,
-                    follow_symlinks=follow_symlinks,
-                    one_filesystem=one_filesystem,
-                    error_limit=error_limit,
+                    follow_symlinks,
+                    one_filesystem,
+                    error_limit,
+                    aggressive_prune,
+                    stat_files,
                 ): child
                 for child in child_dirs
             }
@@ -341,23 +894,26 @@ def scan_directories_parallel(
     combined_errors = list(errors)
     total_errors = error_count
 
-    for report in reports:
-        candidates.extend(report.candidates)
-        total_errors += report.stats.errors
-        dirs_scanned += report.stats.dirs_scanned
-        files_scanned += report.stats.files_scanned
-        skipped_symlinks += report.stats.skipped_symlinks
-        skipped_other_fs += report.stats.skipped_other_fs
+    for raw_candidates, raw_errors, raw_stats, raw_root in reports:
+        candidates.extend(DirResult._make(item) for item in raw_candidates)
+        dirs, files, symlinks, other_fs, child_errors, pruned = raw_stats
+        total_errors += child_errors
+        pruned_dirs += pruned
+        dirs_scanned += dirs
+        files_scanned += files
+        skipped_symlinks += symlinks
+        skipped_other_fs += other_fs
 
-        for err in report.errors:
+        for err_path, message in raw_errors:
             if len(combined_errors) >= error_limit:
                 break
-            combined_errors.append(err)
+            combined_errors.append(ScanError(path=err_path, message=message))
 
-        if report.root_summary is not None:
-            root_size += report.root_summary.size_bytes
-            if report.root_summary.last_touched > root_newest:
-                root_newest = report.root_summary.last_touched
+        if raw_root is not None:
+            _, child_size, child_newest = raw_root
+            root_size += child_size
+            if child_newest > root_newest:
+                root_newest = child_newest
         else:
             root_newest = max(root_newest, now)
 
@@ -373,6 +929,7 @@ def scan_directories_parallel(
         skipped_symlinks=skipped_symlinks,
         skipped_other_fs=skipped_other_fs,
         errors=total_errors,
+        pruned_dirs=pruned_dirs,
     )
 
     return ScanReport(
@@ -383,6 +940,46 @@ def scan_directories_parallel(
     )
 
 
+def _scan_directories_raw(
+    root: str,
+    min_size: int,
+    cutoff: float,
+    time_attr: str,
+    follow_symlinks: bool,
+    one_filesystem: bool,
+    error_limit: int,
+    aggressive_prune: bool,
+    stat_files: bool,
+) -> tuple:
+    # Worker entry point for the process pool: plain tuples pickle much
+    # smaller and faster than the report dataclasses.
+    report = scan_directories(
+        root,
+        min_size,
+        cutoff,
+        time_attr,
+        follow_symlinks=follow_symlinks,
+        one_filesystem=one_filesystem,
+        error_limit=error_limit,
+        aggressive_prune=aggressive_prune,
+        stat_files=stat_files,
+    )
+    stats = report.stats
+    return (
+        [tuple(item) for item in report.candidates],
+        [(err.path, err.message) for err in report.errors],
+        (
+            stats.dirs_scanned,
+            stats.files_scanned,
+            stats.skipped_symlinks,
+            stats.skipped_other_fs,
+            stats.errors,
+            stats.pruned_dirs,
+        ),
+        tuple(report.root_summary) if report.root_summary is not None else None,
+    )
+
+
 def _patch_multiprocessing_tempdir_cleanup() -> None:
     try:
         import multiprocessing.util as mp_util
@@ -409,17 +1006,22 @@ def _patch_multiprocessing_tempdir_cleanup() -> None:
 
 
 def select_top_level(candidates: Iterable[DirResult]) -> list[DirResult]:
+    sep = os.sep
     candidates_list = list(candidates)
-    candidates_list.sort(key=lambda item: (len(Path(item.path).parts), item.path))
+    # Order the separator below every other character so each directory is
+    # immediately followed by its descendants ("a/b", "a/b/c", "a/b-c").
+    candidates_list.sort(key=lambda item: item.path.replace(sep, "\0"))
 
     selected: list[DirResult] = []
-    selected_paths: list[Path] = []
+    last = None
+    prefix = None
 
     for item in candidates_list:
-        path = Path(item.path)
-        if any(path.is_relative_to(base) for base in selected_paths):
+        path = item.path
+        if last is not None and (path == last or path.startswith(prefix)):
             continue
         selected.append(item)
-        selected_paths.append(path)
+        last = path
+        prefix = os.path.join(path, "")
 
     return selected